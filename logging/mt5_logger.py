@@ -36,42 +36,63 @@
   ----------------
   data/
     ticks/XAUUSD/
-      xauusd_ticks_raw.csv
+      date=YYYY-MM-DD.parquet    (one file per UTC day, zstd-compressed)
       state.json
     ohlcv/XAUUSD/
-      M1.csv  M5.csv  M15.csv  M30.csv
-      H1.csv  H4.csv  D1.csv   W1.csv  MN1.csv
+      M1/date=YYYY-MM-DD.parquet ... MN1/date=YYYY-MM-DD.parquet
     dom/XAUUSD/
-      dom_snapshots.csv
+      date=YYYY-MM-DD.parquet
     metadata/
       symbol_info.csv
       session_log.csv
       heartbeat.csv
 
-  TICK CSV COLUMNS
-  ----------------
+  Set CSV_TEE = True to additionally mirror tick/OHLCV/DOM data to the
+  legacy append-only CSVs for human inspection.
+
+  TICK COLUMNS
+  ------------
   time_msc, time_dt, bid, ask, last, volume, volume_real,
   flags, flag_desc, spread, spread_pct, mid, bid_ask_imbalance,
   session, day_of_week, hour_utc
 
-  OHLCV CSV COLUMNS
-  -----------------
+  OHLCV COLUMNS
+  -------------
   time, time_dt, open, high, low, close, tick_volume, real_volume, spread
 
-  DOM CSV COLUMNS
-  ---------------
+  DOM COLUMNS
+  -----------
   time_msc, time_dt, type (BID/ASK), price, volume
 
 =============================================================================
 """
 
 import MetaTrader5 as mt5
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import csv
+import heapq
+import os
 import time
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime, timezone
 
+try:
+    from numba import njit
+    _HAVE_NUMBA = True
+except ImportError:   # optional — pure-NumPy fallbacks are used instead
+    _HAVE_NUMBA = False
+
+try:
+    import numexpr as ne
+    _HAVE_NUMEXPR = True
+except ImportError:   # optional — plain NumPy expressions are used instead
+    _HAVE_NUMEXPR = False
+
 # ─────────────────────────────────────────────────────────────────────────────
 #  CONFIGURATION
 # ─────────────────────────────────────────────────────────────────────────────
@@ -82,8 +103,12 @@ LOOP_SLEEP      = 0.25       # seconds between tick fetch cycles
 HEARTBEAT_SEC   = 10         # console + CSV heartbeat interval (seconds)
 OHLCV_SYNC_SEC  = 60         # sync OHLCV bars every N seconds
 DOM_SNAP_SEC    = 5          # DOM order book snapshot every N seconds
+FLUSH_ROWS      = 5000       # buffered tick/DOM rows before a forced flush
+PQ_ROW_GROUP    = 50_000     # Parquet row-group size for tick files
+CSV_TEE         = False      # also mirror tick/OHLCV/DOM flushes to legacy CSVs
 META_LOG_SEC    = 3600       # re-log symbol metadata every hour
 MAX_FAILS       = 5          # consecutive failures before timestamp reset
+STATE_SAVE_SEC  = 1          # min seconds between state.json writes
 
 TIMEFRAMES = {
     "M1":  mt5.TIMEFRAME_M1,
@@ -114,6 +139,8 @@ META_DIR  = BASE / "metadata"
 
 for _dir in [TICK_DIR, OHLCV_DIR, DOM_DIR, META_DIR]:
     _dir.mkdir(parents=True, exist_ok=True)
+for _tf in TIMEFRAMES:
+    (OHLCV_DIR / _tf).mkdir(exist_ok=True)
 
 TICK_CSV      = TICK_DIR  / "xauusd_ticks_raw.csv"
 STATE_FILE    = TICK_DIR  / "state.json"
@@ -135,18 +162,51 @@ def log(msg: str):
 def msc_to_dt(time_msc: int) -> datetime:
     return datetime.fromtimestamp(time_msc / 1000.0, tz=timezone.utc)
 
-def get_session(dt: datetime) -> str:
-    h = dt.hour + dt.minute / 60.0
-    if 12 <= h < 16:
-        return "LondonNY_Overlap"
-    elif 7 <= h < 16:
-        return "London"
-    elif 12 <= h < 21:
-        return "NewYork"
+# One-slot cache for msc_to_dt: the main loop converts the same resume
+# timestamp several times per batch (fetch window, state save, heartbeat),
+# and a tz-aware datetime allocation per call adds up at 4 Hz.
+_msc_dt_cache = (None, None)
+
+def msc_to_dt_cached(time_msc: int) -> datetime:
+    global _msc_dt_cache
+    if _msc_dt_cache[0] != time_msc:
+        _msc_dt_cache = (time_msc, msc_to_dt(time_msc))
+    return _msc_dt_cache[1]
+
+# Small bounded cache of millisecond timestamp -> ISO string; DOM snapshots
+# and heartbeats keep re-formatting the same handful of timestamps.
+_iso_cache: dict = {}
+
+def iso_of_msc(time_msc: int) -> str:
+    iso = _iso_cache.get(time_msc)
+    if iso is None:
+        if len(_iso_cache) >= 16:
+            _iso_cache.pop(next(iter(_iso_cache)))
+        iso = msc_to_dt_cached(time_msc).isoformat()
+        _iso_cache[time_msc] = iso
+    return iso
+
+# Session index for every minute of the UTC day, precomputed at import.
+# Batch classification becomes a single ndarray index, and the scalar
+# get_session reads the same table so the two paths can never drift.
+SESSION_NAMES = np.array(["Asia", "London", "NewYork", "LondonNY_Overlap"],
+                         dtype=object)
+SESSION_LUT   = np.empty(1440, np.int8)
+for _m in range(1440):
+    _h = _m / 60.0
+    if 12 <= _h < 16:
+        SESSION_LUT[_m] = 3   # LondonNY_Overlap
+    elif 7 <= _h < 16:
+        SESSION_LUT[_m] = 1   # London
+    elif 12 <= _h < 21:
+        SESSION_LUT[_m] = 2   # NewYork
     else:
-        return "Asia"
+        SESSION_LUT[_m] = 0   # Asia
 
-def flag_description(flags: int) -> str:
+def get_session(dt: datetime) -> str:
+    return SESSION_NAMES[SESSION_LUT[dt.hour * 60 + dt.minute]]
+
+def _compute_flag_desc(flags: int) -> str:
     parts = []
     if flags & 0x02: parts.append("BID")
     if flags & 0x04: parts.append("ASK")
@@ -156,14 +216,69 @@ def flag_description(flags: int) -> str:
     if flags & 0x40: parts.append("SELL")
     return "|".join(parts) if parts else "TICK"
 
-def save_state(last_time_msc: int):
+# All 128 possible low-7-bit flag combinations, precomputed at import so both
+# the scalar helper and the batch decoder reduce to a single table index.
+FLAG_DESC_TABLE = np.array([_compute_flag_desc(i) for i in range(128)],
+                           dtype=object)
+
+def flag_description(flags: int) -> str:
+    return FLAG_DESC_TABLE[flags & 0x7F]
+
+# Unique flag strings plus a 128-entry code remap (bit 0 makes neighboring
+# table entries identical, and categorical categories must be unique), so the
+# flag column can be built as a categorical straight from integer codes.
+FLAG_CATS, FLAG_CODES = np.unique(FLAG_DESC_TABLE, return_inverse=True)
+FLAG_CODES            = FLAG_CODES.astype(np.int8)
+
+DAY_NAMES = np.array(["Monday", "Tuesday", "Wednesday", "Thursday", "Friday",
+                      "Saturday", "Sunday"], dtype=object)
+
+# Batch flag decoder for the tick hot path: returns small integer indices on
+# ndarray input; mapping indices to Python strings happens once per batch
+# outside the compiled region. With numba installed this JITs to a tight
+# native loop (compile cost cached, amortized over months of runtime);
+# without it the NumPy fallback keeps identical behavior.
+
+if _HAVE_NUMBA:
+    @njit(cache=True)
+    def decode_flag_idx(flags):
+        out = np.empty(flags.size, np.uint8)
+        for i in range(flags.size):
+            out[i] = flags[i] & 0x7F
+        return out
+else:
+    def decode_flag_idx(flags):
+        return (flags & 0x7F).astype(np.uint8)
+
+# The state schema is fixed, so a formatted template beats json.dump and its
+# intermediate allocations at the several-Hz call rate of the main loop.
+_STATE_TEMPLATE = (
+    '{{\n'
+    '  "last_time_msc": {0},\n'
+    '  "last_time_dt": "{1}",\n'
+    '  "updated_at": "{2}"\n'
+    '}}'
+)
+_STATE_TMP       = STATE_FILE.with_suffix(".tmp")
+_last_state_save = 0.0
+
+def save_state(last_time_msc: int, force: bool = False):
+    """Persist the resume pointer. Writes are throttled to one per
+    STATE_SAVE_SEC (resume tolerance is already ±2s) and go through a tmp
+    file + os.replace so state.json is never seen half-written."""
+    global _last_state_save
+    now = time.time()
+    if not force and now - _last_state_save < STATE_SAVE_SEC:
+        return
     try:
-        with open(STATE_FILE, "w") as f:
-            json.dump({
-                "last_time_msc": int(last_time_msc),
-                "last_time_dt":  msc_to_dt(last_time_msc).isoformat(),
-                "updated_at":    now_utc().isoformat(),
-            }, f, indent=2)
+        with open(_STATE_TMP, "w") as f:
+            f.write(_STATE_TEMPLATE.format(
+                int(last_time_msc),
+                msc_to_dt_cached(last_time_msc).isoformat(),
+                now_utc().isoformat(),
+            ))
+        os.replace(_STATE_TMP, STATE_FILE)
+        _last_state_save = now
     except Exception as e:
         log(f"[STATE] Failed to save state: {e}")
 
@@ -192,32 +307,217 @@ TICK_COLUMNS = [
     "session", "day_of_week", "hour_utc",
 ]
 
-def process_ticks(ticks_raw) -> pd.DataFrame:
-    df = pd.DataFrame(ticks_raw)
+# Output column list resolved once from the first batch — the MT5 tick
+# schema is fixed for the life of the process, so the TICK_COLUMNS
+# membership filter doesn't need to rerun per batch.
+_tick_out_cols: list = None
 
-    if "volume_real" not in df.columns:
-        df["volume_real"] = 0.0
+def process_ticks(ticks_raw) -> pd.DataFrame:
+    global _tick_out_cols
+    # ticks_raw is the structured ndarray returned by mt5.copy_ticks_from;
+    # every derived field is computed as a plain ndarray on its columns, and
+    # pandas only enters at the final assembly (no upfront DataFrame copy).
+    t    = ticks_raw
+    bid  = t["bid"]
+    ask  = t["ask"]
+    cols = {name: t[name] for name in t.dtype.names}
+
+    if "volume_real" not in cols:
+        cols["volume_real"] = np.zeros(t.shape[0])
+
+    # Decode time_msc once; every time-derived column below reuses this vector
+    dts           = pd.to_datetime(t["time_msc"], unit="ms", utc=True)
+    minute_of_day = dts.hour.values * 60 + dts.minute.values
 
     # Derived price fields
-    df["time_dt"]           = df["time_msc"].apply(lambda x: msc_to_dt(x).isoformat())
-    df["spread_pct"]        = ((df["ask"] - df["bid"]) / df["bid"] * 100).round(6)
-    df["mid"]               = ((df["bid"] + df["ask"]) / 2).round(5)
-    df["bid_ask_imbalance"] = (df["bid"] / df["ask"]).round(6)
-    df["flag_desc"]         = df["flags"].apply(flag_description)
-
-    # Time metadata
-    dts                 = pd.to_datetime(df["time_msc"], unit="ms", utc=True)
-    df["session"]       = dts.apply(lambda x: get_session(x))
-    df["day_of_week"]   = dts.dt.day_name()
-    df["hour_utc"]      = dts.dt.hour
-
-    return df[[c for c in TICK_COLUMNS if c in df.columns]]
+    # Offset is always UTC, so spell out "+00:00" (isoformat style; %z would
+    # render "+0000") instead of paying per-row tz formatting.
+    cols["time_dt"] = dts.strftime("%Y-%m-%dT%H:%M:%S.%f+00:00")
+
+    # numexpr fuses each expression into blocked, SIMD-friendly loops. The
+    # two ratio columns are O(1)-magnitude and fit float32 comfortably at 6
+    # rounded decimals, halving their width on disk; mid stays float64 —
+    # float32 resolution at XAUUSD price levels (~2.4e-4) is coarser than
+    # its 5-decimal rounding.
+    if _HAVE_NUMEXPR:
+        spread_pct = ne.evaluate("(ask - bid) / bid * 100")
+        mid        = ne.evaluate("(bid + ask) * 0.5")
+        imb        = ne.evaluate("bid / ask")
+    else:
+        spread_pct = (ask - bid) / bid * 100
+        mid        = (bid + ask) * 0.5
+        imb        = bid / ask
+    cols["spread_pct"]        = np.round(spread_pct, 6).astype(np.float32)
+    cols["mid"]               = np.round(mid, 5)
+    cols["bid_ask_imbalance"] = np.round(imb, 6).astype(np.float32)
+
+    # Low-cardinality columns become categoricals built straight from their
+    # integer codes — no per-row string materialization here, and pyarrow
+    # maps them onto Parquet dictionary columns (1 byte/row + RLE) for free.
+    cols["flag_desc"] = pd.Categorical.from_codes(
+        FLAG_CODES[decode_flag_idx(t["flags"])], FLAG_CATS)
+    cols["session"]   = pd.Categorical.from_codes(
+        SESSION_LUT[minute_of_day], SESSION_NAMES)
+    cols["day_of_week"] = pd.Categorical.from_codes(
+        dts.dayofweek.values.astype(np.int8), DAY_NAMES)
+    cols["hour_utc"]    = dts.hour
+
+    if _tick_out_cols is None:
+        _tick_out_cols = [c for c in TICK_COLUMNS if c in cols]
+    return pd.DataFrame({c: cols[c] for c in _tick_out_cols}, copy=False)
+
+# ─── Parquet output ─────────────────────────────────────────────────────────
+# Primary storage is columnar Parquet, one file per stream per UTC day
+# (e.g. ticks/XAUUSD/date=2025-01-14.parquet). Low-cardinality string columns
+# are dictionary-encoded, so disk footprint drops 5-10x versus raw CSV and
+# research reads become column scans instead of full-file parses. The legacy
+# CSVs remain available as a human-readable tee via CSV_TEE.
+
+DICT_COLUMNS = ["session", "flag_desc", "day_of_week", "type"]
+
+# One live ParquetWriter per stream ("ticks", "dom", "ohlcv_M1", ...), stored
+# as {stream: (day_str, writer, sink)} and rotated when the UTC day rolls
+# over. The sink is our own pa.OSFile so its tell() doubles as a running
+# byte count for the heartbeat — no stat() or glob() needed there.
+
+_pq_writers: dict = {}
+
+# Bytes in already-closed day files, tracked per stream: each stream is only
+# ever retired by the thread running its sync, so per-stream counters need no
+# lock (a single per-family counter would be a racy read-modify-write when
+# several OHLCV writers rotate at the same UTC midnight). Seeded from disk
+# once at startup so the heartbeat totals stay cumulative across restarts.
+_bytes_closed = {
+    "ticks": sum(f.stat().st_size for f in TICK_DIR.glob("*.parquet")),
+    "dom":   sum(f.stat().st_size for f in DOM_DIR.glob("*.parquet")),
+}
+for _tf in TIMEFRAMES:
+    _bytes_closed[f"ohlcv_{_tf}"] = sum(
+        f.stat().st_size for f in (OHLCV_DIR / _tf).glob("*.parquet"))
+
+def _stream_family(stream: str) -> str:
+    return "ohlcv" if stream.startswith("ohlcv_") else stream
+
+def data_bytes(family: str) -> int:
+    # Summing happens here, on the main thread, never in the pool workers.
+    total = 0
+    for stream, nbytes in _bytes_closed.items():
+        if _stream_family(stream) == family:
+            total += nbytes
+    for stream, (_, _, sink) in _pq_writers.items():
+        if _stream_family(stream) == family:
+            total += sink.tell()
+    return total
+
+def _new_day_sink(directory: Path, day: str) -> pa.OSFile:
+    # Never clobber an existing day file — a restart mid-day opens a numbered
+    # sibling instead (readers glob the directory, so both parts are seen).
+    path = directory / f"date={day}.parquet"
+    part = 0
+    while path.exists():
+        part += 1
+        path = directory / f"date={day}.{part}.parquet"
+    return pa.OSFile(str(path), "wb")
+
+def _retire_writer(stream: str):
+    day, writer, sink = _pq_writers.pop(stream)
+    try:
+        writer.close()
+        _bytes_closed[stream] += sink.tell()
+        sink.close()
+    except Exception as e:
+        log(f"[PARQUET] Close error ({stream}, {day}): {e}")
+
+def _append_parquet(stream: str, directory: Path, df: pd.DataFrame,
+                    epoch_days: np.ndarray):
+    """Append df to the stream's day file, splitting batches that straddle
+    UTC midnight. epoch_days holds the per-row day number since the epoch."""
+    unique_days = np.unique(epoch_days)
+    for day_ord in unique_days:
+        part  = df if len(unique_days) == 1 else df[epoch_days == day_ord]
+        day   = str(np.datetime64(int(day_ord), "D"))
+        table = pa.Table.from_pandas(part, preserve_index=False)
+
+        entry = _pq_writers.get(stream)
+        if entry is not None and entry[0] != day:
+            _retire_writer(stream)
+            entry = None
+        if entry is None:
+            sink   = _new_day_sink(directory, day)
+            writer = pq.ParquetWriter(
+                sink,
+                table.schema,
+                compression="zstd",
+                use_dictionary=[c for c in DICT_COLUMNS if c in part.columns],
+            )
+            entry = (day, writer, sink)
+            _pq_writers[stream] = entry
+        entry[1].write_table(table, row_group_size=PQ_ROW_GROUP)
+
+def close_parquet_writers():
+    for stream in list(_pq_writers):
+        _retire_writer(stream)
+
+class CsvAppender:
+    """Append-only CSV sink for fixed-schema single-row writers (metadata,
+    session log, heartbeat). The handle is opened once for the process
+    lifetime and the header is written only if the file starts empty —
+    no per-write open/stat/close cycle. Writes ride the file buffer; rare
+    sinks flush after each row, the heartbeat flushes itself every beat."""
+
+    def __init__(self, path: Path, header: list):
+        self.header = header
+        was_empty   = not path.exists() or path.stat().st_size == 0
+        self.f      = open(path, "a", newline="", buffering=1 << 16)
+        self.w      = csv.DictWriter(self.f, fieldnames=header)
+        if was_empty:
+            self.w.writeheader()
+
+    def writerow(self, row: dict):
+        self.w.writerow(row)
+
+    def flush(self):
+        self.f.flush()
+
+# Append-only CSV handles are opened once and kept for the process lifetime;
+# each entry is [file, header_pending]. Avoids the open/stat/close cycle that
+# to_csv(mode="a") pays on every call.
+_csv_handles: dict = {}
+
+def _append_df(path: Path, df: pd.DataFrame):
+    entry = _csv_handles.get(path)
+    if entry is None:
+        write_header = not path.exists() or path.stat().st_size == 0
+        entry = [open(path, "a", newline="", buffering=1 << 20), write_header]
+        _csv_handles[path] = entry
+    df.to_csv(entry[0], index=False, header=entry[1])
+    entry[0].flush()
+    entry[1] = False
+
+# Processed tick batches accumulate here and hit disk in one write per flush
+# (every FLUSH_ROWS rows or on heartbeat) instead of one write per loop cycle.
+_tick_buffer: list = []
+_tick_buffer_rows = 0
 
 def append_ticks(df: pd.DataFrame):
+    global _tick_buffer_rows
     if df is None or len(df) == 0:
         return
-    write_header = not TICK_CSV.exists()
-    df.to_csv(TICK_CSV, mode="a", index=False, header=write_header)
+    _tick_buffer.append(df)
+    _tick_buffer_rows += len(df)
+    if _tick_buffer_rows >= FLUSH_ROWS:
+        flush_ticks()
+
+def flush_ticks():
+    global _tick_buffer, _tick_buffer_rows
+    if not _tick_buffer:
+        return
+    df = _tick_buffer[0] if len(_tick_buffer) == 1 else pd.concat(_tick_buffer)
+    _append_parquet("ticks", TICK_DIR, df, df["time_msc"].values // 86_400_000)
+    if CSV_TEE:
+        _append_df(TICK_CSV, df)
+    _tick_buffer      = []
+    _tick_buffer_rows = 0
 
 # ─────────────────────────────────────────────────────────────────────────────
 #  OHLCV BAR LOGGING
@@ -230,9 +530,25 @@ OHLCV_COLUMNS = [
 
 ohlcv_last_bar: dict = {tf: 0 for tf in TIMEFRAMES}
 
+# Per-timeframe output columns, resolved once from each timeframe's first
+# fetch (the rate schema never changes afterwards).
+_ohlcv_out_cols: dict = {}
+
 def sync_ohlcv(tf_name: str, tf_const: int):
     try:
-        rates = mt5.copy_rates_from_pos(SYMBOL, tf_const, 0, OHLCV_LOOKBACK[tf_name])
+        last_bar = ohlcv_last_bar[tf_name]
+        if last_bar:
+            # Steady state: fetch only bars since the last one written — the
+            # still-open bar at last_bar comes back too and is filtered below.
+            rates = mt5.copy_rates_range(
+                SYMBOL, tf_const,
+                datetime.fromtimestamp(last_bar, tz=timezone.utc),
+                now_utc(),
+            )
+        else:
+            # Bootstrap: pull the configured lookback window once.
+            rates = mt5.copy_rates_from_pos(SYMBOL, tf_const, 0,
+                                            OHLCV_LOOKBACK[tf_name])
         if rates is None or len(rates) == 0:
             return
 
@@ -244,31 +560,56 @@ def sync_ohlcv(tf_name: str, tf_const: int):
         if "real_volume" not in df.columns:
             df["real_volume"] = 0.0
 
-        df       = df[[c for c in OHLCV_COLUMNS if c in df.columns]]
+        out_cols = _ohlcv_out_cols.get(tf_name)
+        if out_cols is None:
+            out_cols = [c for c in OHLCV_COLUMNS if c in df.columns]
+            _ohlcv_out_cols[tf_name] = out_cols
+        df       = df[out_cols]
         new_df   = df[df["time"] > ohlcv_last_bar[tf_name]]
         if len(new_df) == 0:
             return
 
-        csv_path     = OHLCV_DIR / f"{tf_name}.csv"
-        write_header = not csv_path.exists()
-        new_df.to_csv(csv_path, mode="a", index=False, header=write_header)
+        _append_parquet(f"ohlcv_{tf_name}", OHLCV_DIR / tf_name, new_df,
+                        new_df["time"].values // 86_400)
+        if CSV_TEE:
+            _append_df(OHLCV_DIR / f"{tf_name}.csv", new_df)
         ohlcv_last_bar[tf_name] = int(df["time"].max())
 
     except Exception as e:
         log(f"[OHLCV] Sync error ({tf_name}): {e}")
 
+# Per-timeframe syncs are independent — each owns its own files and its own
+# ohlcv_last_bar slot — and spend most of their time blocked on the MT5
+# terminal RPC, so a small thread pool turns the serial sum of 9 round-trips
+# into roughly the slowest one.
+_ohlcv_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="ohlcv")
+
 def sync_all_ohlcv():
-    for tf_name, tf_const in TIMEFRAMES.items():
-        sync_ohlcv(tf_name, tf_const)
+    list(_ohlcv_pool.map(lambda kv: sync_ohlcv(*kv), TIMEFRAMES.items()))
 
 # ─────────────────────────────────────────────────────────────────────────────
 #  DOM (DEPTH OF MARKET) LOGGING
 # ─────────────────────────────────────────────────────────────────────────────
 
-DOM_COLUMNS   = ["time_msc", "time_dt", "type", "price", "volume"]
+DOM_TYPES     = np.array(["ASK", "BID"], dtype=object)
 dom_supported = None  # auto-detected on first attempt
 
-def snap_dom():
+# DOM snapshots buffer like ticks do — flushed on heartbeat or at FLUSH_ROWS
+_dom_buffer: list = []
+_dom_buffer_rows = 0
+
+def flush_dom():
+    global _dom_buffer, _dom_buffer_rows
+    if not _dom_buffer:
+        return
+    df = _dom_buffer[0] if len(_dom_buffer) == 1 else pd.concat(_dom_buffer)
+    _append_parquet("dom", DOM_DIR, df, df["time_msc"].values // 86_400_000)
+    if CSV_TEE:
+        _append_df(DOM_CSV, df)
+    _dom_buffer      = []
+    _dom_buffer_rows = 0
+
+def snap_dom(now_s: float):
     global dom_supported
     if dom_supported is False:
         return
@@ -283,21 +624,29 @@ def snap_dom():
             return
 
         dom_supported = True
-        t_msc = int(time.time() * 1000)
-        t_dt  = msc_to_dt(t_msc).isoformat()
-
-        rows = [{
-            "time_msc": t_msc,
+        t_msc = int(now_s * 1000)
+        t_dt  = iso_of_msc(t_msc)
+        n_lvl = len(book)
+
+        # Pull each numeric field straight into an ndarray — no dict per level
+        prices   = np.fromiter((e.price for e in book),
+                               dtype=np.float64, count=n_lvl)
+        vols     = np.fromiter((e.volume for e in book),
+                               dtype=np.float64, count=n_lvl)
+        type_idx = np.fromiter((e.type == mt5.BOOK_TYPE_BUY for e in book),
+                               dtype=np.int8, count=n_lvl)
+
+        global _dom_buffer_rows
+        _dom_buffer.append(pd.DataFrame({
+            "time_msc": np.full(n_lvl, t_msc, dtype=np.int64),
             "time_dt":  t_dt,
-            "type":     "BID" if entry.type == mt5.BOOK_TYPE_BUY else "ASK",
-            "price":    entry.price,
-            "volume":   entry.volume,
-        } for entry in book]
-
-        if rows:
-            df           = pd.DataFrame(rows)[DOM_COLUMNS]
-            write_header = not DOM_CSV.exists()
-            df.to_csv(DOM_CSV, mode="a", index=False, header=write_header)
+            "type":     pd.Categorical.from_codes(type_idx, DOM_TYPES),
+            "price":    prices,
+            "volume":   vols,
+        }, copy=False))
+        _dom_buffer_rows += n_lvl
+        if _dom_buffer_rows >= FLUSH_ROWS:
+            flush_dom()
 
     except Exception as e:
         log(f"[DOM] Snapshot error: {e}")
@@ -315,15 +664,17 @@ META_FIELDS = [
     "margin_initial", "margin_maintenance", "margin_hedged",
 ]
 
-def log_metadata():
+_meta_out = CsvAppender(META_CSV, ["logged_at", *META_FIELDS])
+
+def log_metadata(now_s: float):
     try:
         info = mt5.symbol_info(SYMBOL)
         if info is None:
             return
-        row = {"logged_at": now_utc().isoformat()}
+        row = {"logged_at": iso_of_msc(int(now_s * 1000))}
         row.update({f: getattr(info, f, None) for f in META_FIELDS})
-        write_header = not META_CSV.exists()
-        pd.DataFrame([row]).to_csv(META_CSV, mode="a", index=False, header=write_header)
+        _meta_out.writerow(row)
+        _meta_out.flush()
     except Exception as e:
         log(f"[META] Log error: {e}")
 
@@ -332,11 +683,29 @@ def log_metadata():
 # ─────────────────────────────────────────────────────────────────────────────
 
 _current_session: str = None
-
-def check_session_change(dt: datetime):
-    global _current_session
-    sess = get_session(dt)
+_session_out = CsvAppender(SESSION_CSV, ["time_dt", "session", "prev", "weekday"])
+
+# Sessions only flip at these UTC hours; the main loop skips the check
+# entirely until the newest tick crosses the next boundary timestamp.
+_SESSION_BOUNDARY_HOURS  = (7, 12, 16, 21)
+_next_session_change_msc = 0
+
+def _next_session_boundary_msc(time_msc: int) -> int:
+    hour_msc  = 3_600_000
+    day_start = time_msc - time_msc % (24 * hour_msc)
+    hour      = (time_msc - day_start) // hour_msc
+    for b in _SESSION_BOUNDARY_HOURS:
+        if hour < b:
+            return day_start + b * hour_msc
+    return day_start + (24 + _SESSION_BOUNDARY_HOURS[0]) * hour_msc
+
+def check_session_change(time_msc: int):
+    global _current_session, _next_session_change_msc
+    _next_session_change_msc = _next_session_boundary_msc(time_msc)
+    # Pure int math in the no-change case — no datetime allocation.
+    sess = SESSION_NAMES[SESSION_LUT[(time_msc // 60_000) % 1440]]
     if sess != _current_session:
+        dt  = msc_to_dt(time_msc)
         row = {
             "time_dt":  dt.isoformat(),
             "session":  sess,
@@ -344,33 +713,40 @@ def check_session_change(dt: datetime):
             "weekday":  dt.strftime("%A"),
         }
         _current_session = sess
-        write_header = not SESSION_CSV.exists()
-        pd.DataFrame([row]).to_csv(SESSION_CSV, mode="a", index=False, header=write_header)
+        _session_out.writerow(row)
+        _session_out.flush()
         log(f"[SESSION] {row['prev']} → {sess}")
 
 # ─────────────────────────────────────────────────────────────────────────────
 #  HEARTBEAT LOGGING
 # ─────────────────────────────────────────────────────────────────────────────
 
-def log_heartbeat(last_time_msc: int, ticks_batch: int, total_ticks: int):
+_heartbeat_out = CsvAppender(HEARTBEAT_CSV, [
+    "time_dt", "last_time_msc", "last_tick_dt", "ticks_batch", "total_ticks",
+    "tick_mb", "ohlcv_mb", "dom_mb", "session",
+])
+
+def log_heartbeat(now_s: float, last_time_msc: int, ticks_batch: int,
+                  total_ticks: int):
     try:
-        tick_mb  = TICK_CSV.stat().st_size  / 1024**2 if TICK_CSV.exists()  else 0.0
-        ohlcv_mb = sum(f.stat().st_size for f in OHLCV_DIR.glob("*.csv")) / 1024**2
-        dom_mb   = DOM_CSV.stat().st_size   / 1024**2 if DOM_CSV.exists()   else 0.0
+        tick_mb  = data_bytes("ticks") / 1024**2
+        ohlcv_mb = data_bytes("ohlcv") / 1024**2
+        dom_mb   = data_bytes("dom")   / 1024**2
 
+        now = datetime.fromtimestamp(now_s, tz=timezone.utc)
         row = {
-            "time_dt":       now_utc().isoformat(),
+            "time_dt":       now.isoformat(),
             "last_time_msc": last_time_msc,
-            "last_tick_dt":  msc_to_dt(last_time_msc).isoformat(),
+            "last_tick_dt":  iso_of_msc(last_time_msc),
             "ticks_batch":   ticks_batch,
             "total_ticks":   total_ticks,
             "tick_mb":       round(tick_mb, 3),
             "ohlcv_mb":      round(ohlcv_mb, 3),
             "dom_mb":        round(dom_mb, 3),
-            "session":       get_session(now_utc()),
+            "session":       get_session(now),
         }
-        write_header = not HEARTBEAT_CSV.exists()
-        pd.DataFrame([row]).to_csv(HEARTBEAT_CSV, mode="a", index=False, header=write_header)
+        _heartbeat_out.writerow(row)
+        _heartbeat_out.flush()
 
         log(
             f"[HEARTBEAT] batch={ticks_batch:>4}  total={total_ticks:>10,}  "
@@ -380,6 +756,12 @@ def log_heartbeat(last_time_msc: int, ticks_batch: int, total_ticks: int):
     except Exception as e:
         log(f"[HEARTBEAT] Log error: {e}")
 
+def run_heartbeat(now_s: float):
+    # Flush the data buffers first so the reported sizes are current.
+    flush_ticks()
+    flush_dom()
+    log_heartbeat(now_s, last_time_msc, n, total_ticks)
+
 # ─────────────────────────────────────────────────────────────────────────────
 #  STARTUP
 # ─────────────────────────────────────────────────────────────────────────────
@@ -387,9 +769,9 @@ def log_heartbeat(last_time_msc: int, ticks_batch: int, total_ticks: int):
 log("=" * 70)
 log("  XAUUSD PROFESSIONAL QUANT DATA LOGGER  v2.0.0")
 log("=" * 70)
-log(f"  Ticks     : {TICK_CSV}")
+log(f"  Ticks     : {TICK_DIR}")
 log(f"  OHLCV     : {OHLCV_DIR}")
-log(f"  DOM       : {DOM_CSV}")
+log(f"  DOM       : {DOM_DIR}")
 log(f"  Metadata  : {META_DIR}")
 log("=" * 70)
 
@@ -397,20 +779,36 @@ if not mt5.initialize():
     raise RuntimeError(f"MT5 initialization failed: {mt5.last_error()}")
 log("[INIT] MT5 connected successfully")
 
-log_metadata()
+log_metadata(time.time())
 log("[INIT] Symbol metadata logged")
 
 log("[INIT] Syncing historical OHLCV bars for all timeframes...")
 sync_all_ohlcv()
 log("[INIT] OHLCV sync complete")
 
-last_time_msc   = load_state()
-last_heartbeat  = time.time()
-last_ohlcv_sync = time.time()
-last_dom_snap   = time.time()
-last_meta_log   = time.time()
-fail_count      = 0
-total_ticks     = 0
+last_time_msc = load_state()
+fail_count    = 0
+total_ticks   = 0
+n             = 0   # ticks in the most recent batch, reported by the heartbeat
+
+# Periodic tasks live on a min-heap of (next_deadline, name); each iteration
+# runs whatever is due and then sleeps only until the earlier of the next
+# tick poll and the next deadline, instead of re-checking every interval 4x/s.
+# Every task receives the loop timestamp so none of them query the clock.
+TASK_FNS = {
+    "ohlcv":     lambda now_s: sync_all_ohlcv(),
+    "dom":       snap_dom,
+    "meta":      log_metadata,
+    "heartbeat": run_heartbeat,
+}
+TASK_INTERVAL = {
+    "ohlcv":     OHLCV_SYNC_SEC,
+    "dom":       DOM_SNAP_SEC,
+    "meta":      META_LOG_SEC,
+    "heartbeat": HEARTBEAT_SEC,
+}
+_task_heap = [(time.time() + iv, name) for name, iv in TASK_INTERVAL.items()]
+heapq.heapify(_task_heap)
 
 log(f"[INIT] Resuming from {msc_to_dt(last_time_msc).isoformat()}")
 log("[INIT] Logger is running. Press Ctrl+C to stop safely.")
@@ -422,27 +820,24 @@ log("=" * 70)
 
 while True:
     try:
+        # ── Run whatever periodic tasks are due ──────────────────────────────
+        # One clock read per iteration; tasks get it passed in, and deadlines
+        # re-arm off the same anchor as the pre-heap interval checks did.
         now = time.time()
-
-        # ── Periodic: OHLCV sync ─────────────────────────────────────────────
-        if now - last_ohlcv_sync >= OHLCV_SYNC_SEC:
-            sync_all_ohlcv()
-            last_ohlcv_sync = now
-
-        # ── Periodic: DOM snapshot ───────────────────────────────────────────
-        if now - last_dom_snap >= DOM_SNAP_SEC:
-            snap_dom()
-            last_dom_snap = now
-
-        # ── Periodic: Metadata re-log ────────────────────────────────────────
-        if now - last_meta_log >= META_LOG_SEC:
-            log_metadata()
-            last_meta_log = now
+        while _task_heap[0][0] <= now:
+            _, name = heapq.heappop(_task_heap)
+            try:
+                TASK_FNS[name](now)
+            finally:
+                # Re-arm unconditionally — a task that raises (transient I/O
+                # error in a flush, say) must not vanish from the schedule;
+                # the exception still reaches the outer loop's handler.
+                heapq.heappush(_task_heap, (now + TASK_INTERVAL[name], name))
 
         # ── Fetch ticks ──────────────────────────────────────────────────────
         ticks_raw = []
         try:
-            from_dt   = msc_to_dt(last_time_msc)
+            from_dt   = msc_to_dt_cached(last_time_msc)
             ticks_raw = mt5.copy_ticks_from(SYMBOL, from_dt, TICK_BATCH, mt5.COPY_TICKS_ALL)
             if ticks_raw is None:
                 err = mt5.last_error()
@@ -471,18 +866,18 @@ while True:
                 total_ticks  += len(df)
                 last_time_msc = new_last + 1
                 save_state(last_time_msc)
-                check_session_change(msc_to_dt(new_last))
-
-        # ── Heartbeat ────────────────────────────────────────────────────────
-        if now - last_heartbeat >= HEARTBEAT_SEC:
-            log_heartbeat(last_time_msc, n, total_ticks)
-            last_heartbeat = now
+                if new_last >= _next_session_change_msc:
+                    check_session_change(new_last)
 
-        time.sleep(LOOP_SLEEP)
+        # ── Sleep until the next tick poll or the next deadline ──────────────
+        time.sleep(max(0.0, min(LOOP_SLEEP, _task_heap[0][0] - time.time())))
 
     except KeyboardInterrupt:
-        log("[SHUTDOWN] Interrupt received. Saving state...")
-        save_state(last_time_msc)
+        log("[SHUTDOWN] Interrupt received. Flushing buffers and saving state...")
+        flush_ticks()
+        flush_dom()
+        close_parquet_writers()
+        save_state(last_time_msc, force=True)
         mt5.shutdown()
         log("[SHUTDOWN] Logger stopped cleanly. State saved.")
         break